@@ -2,20 +2,26 @@
 
 import gradio as gr
 import subprocess
+import asyncio
 import os
 import tempfile
 import shutil
+import shlex
+import atexit
 import logging
 import time
+import functools
+import contextlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import pickle
 import json
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-import io
+import re
+import mimetypes
+import importlib.util
+from collections import deque
+from media_utils import read_container_duration, trim_with_pyav
+import media_utils
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,23 +29,188 @@ logger = logging.getLogger(__name__)
 
 # Google Drive configuration
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
-TOKEN_FILE = 'oauth_token.pickle'
+TOKEN_FILE = 'oauth_token.json'
+# Token file written by earlier versions, converted to TOKEN_FILE on first use
+LEGACY_TOKEN_FILE = 'oauth_token.pickle'
 CREDENTIALS_FILE = 'oauth_credentials.json'
+# Whether the Google client libraries are installed, checked without importing them (they load lazily on
+# first use); google-auth comes in as a dependency of both
+GOOGLE_DRIVE_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None
+    for name in ('googleapiclient', 'google_auth_oauthlib')
+)
 
-def get_google_drive_service():
-    """Get Google Drive service with local OAuth credentials"""
+# Resolve the ffmpeg binaries once instead of searching PATH on every call
+FFMPEG = shutil.which("ffmpeg") or "ffmpeg"
+FFPROBE = shutil.which("ffprobe") or "ffprobe"
+
+# ffmpeg concurrency: bound simultaneous jobs and threads per job so parallel trims don't thrash the CPU
+MAX_FFMPEG_JOBS = int(os.environ.get("MAX_FFMPEG", (os.cpu_count() or 2) // 2 or 1))
+# Split the cores between the concurrent jobs instead of letting each ffmpeg default to all of them
+FFMPEG_THREADS = max(1, (os.cpu_count() or 4) // MAX_FFMPEG_JOBS)
+_ffmpeg_semaphore = asyncio.Semaphore(MAX_FFMPEG_JOBS)
+# Leading arguments shared by every ffmpeg job, built once: overwrite, no stdin, quiet logs, and
+# machine-readable progress on stdout
+FFMPEG_PREFIX = (FFMPEG, "-y", "-nostdin", "-hide_banner", "-v", "warning", "-nostats", "-progress", "pipe:1")
+FFMPEG_THREADS_ARG = str(FFMPEG_THREADS)
+# Lines of ffmpeg stderr kept for error messages; older lines are dropped
+FFMPEG_STDERR_TAIL_LINES = 200
+# How many events of each kind Gradio runs concurrently (its default is 1)
+GRADIO_CONCURRENCY = int(os.environ.get("GRADIO_CONCURRENCY", 4))
+# Ranges within this many seconds of both ends of the video count as "the whole file"
+FULL_RANGE_TOLERANCE = 0.05
+
+# Per-process scratch root; each browser session gets its own subdirectory, removed when the session ends.
+# It must stay under the system temp dir: Gradio refuses to serve returned files from anywhere else
+# (and copies them into its own cache regardless, so a tmpfs root would save nothing).
+_scratch_root = tempfile.mkdtemp(prefix="trim-convert-")
+# Output directories already created by ensure_dir(); makedirs can be slow on network filesystems
+_created_dirs = set()
+
+# Trims run through the ffmpeg CLI (with progress); set TRIM_BACKEND=pyav to remux in-process with PyAV instead
+TRIM_BACKEND = os.environ.get("TRIM_BACKEND", "ffmpeg")
+
+# Drive downloads are kept here, keyed by file ID and md5Checksum, so reopening a file skips the download
+DRIVE_CACHE_DIR = Path('~/.cache/trim-convert').expanduser()
+# Byte budget for that cache; least recently used downloads are evicted beyond it
+DRIVE_CACHE_MAX_BYTES = int(os.environ.get("DRIVE_CACHE_MAX_BYTES", 10 * 1024 * 1024 * 1024))
+DRIVE_FILE_FIELDS = 'name,size,md5Checksum'
+
+# Drive video listings are reused for this many seconds, keyed by folder ID
+DRIVE_LIST_TTL = 60
+_drive_list_cache = {}
+# Per-file metadata from files().get(), reused for the same TTL so reopening a file skips the lookup
+_drive_meta_cache = {}
+DRIVE_META_CACHE_SIZE = 256
+
+# Upper bound on how many Drive videos list_drive_videos collects across pages
+DRIVE_LIST_LIMIT = 5000
+
+# Drive file links (with or without https), and a bare file ID (Drive IDs are at least 25 characters)
+_DRIVE_LINK_RE = re.compile(
+    r'(?:drive\.google\.com/file/d/|drive\.google\.com/open\?id=|docs\.google\.com/file/d/|id=|/d/(?=[a-zA-Z0-9_-]+/))'
+    r'([a-zA-Z0-9_-]+)'
+)
+_DRIVE_BARE_ID_RE = re.compile(r'[a-zA-Z0-9_-]{25,}')
+
+# Drive downloads larger than one range are fetched as concurrent HTTP Range requests
+DRIVE_RANGE_BYTES = 32 * 1024 * 1024
+DRIVE_DOWNLOAD_WORKERS = 8
+# Chunk sizes for the sequential download path and resumable uploads; the library defaults (100 KB) cost a round-trip each
+DRIVE_DOWNLOAD_CHUNK_BYTES = 64 * 1024 * 1024
+DRIVE_UPLOAD_CHUNK_BYTES = 32 * 1024 * 1024
+# Upload content types for the formats this app writes or loads; anything else falls back to mimetypes.
+# Without a type Drive stores the file as application/octet-stream and won't preview it.
+UPLOAD_MIME_TYPES = {
+    '.mp4': 'video/mp4',
+    '.m4v': 'video/mp4',
+    '.mov': 'video/quicktime',
+    '.mkv': 'video/x-matroska',
+    '.webm': 'video/webm',
+    '.avi': 'video/x-msvideo',
+    '.aac': 'audio/aac',
+    '.m4a': 'audio/mp4',
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+}
+
+# The Drive client is built once and reused until the token file changes on disk
+_drive_service = None
+_drive_service_token_mtime = None
+_drive_service_lock = threading.Lock()
+_drive_media_session_cached = None
+# httplib2.Http (inside every Drive client) isn't thread-safe, so each worker thread gets its own
+# client sharing the cached one's credentials
+_drive_thread_local = threading.local()
+# The thread that built _drive_service uses it directly; every other thread builds its own
+_drive_service_owner = None
+
+def _token_mtime():
+    """Modification time of the OAuth token file, or None if it doesn't exist"""
+    try:
+        return os.stat(TOKEN_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+def get_google_drive_service(interactive=True):
+    """Get this thread's Google Drive service with local OAuth credentials
+
+    With interactive=False, return None instead of starting the browser OAuth flow when the saved
+    token can't be used or refreshed.
+    """
+    if not GOOGLE_DRIVE_AVAILABLE:
+        logger.warning("⚠️ Google API client libraries not installed. Google Drive integration disabled.")
+        return None
+    shared = _shared_drive_service(interactive)
+    if shared is None or _drive_service_owner == threading.get_ident():
+        return shared
+    
+    if getattr(_drive_thread_local, 'shared', None) is not shared:
+        from googleapiclient.discovery import build
+        _drive_thread_local.service = build('drive', 'v3', credentials=shared._http.credentials,
+                                            cache_discovery=False, static_discovery=True)
+        _drive_thread_local.shared = shared
+    return _drive_thread_local.service
+
+def _shared_drive_service(interactive=True):
+    """Build (or reuse) the process-wide Drive client, which owns the credentials"""
+    global _drive_service, _drive_service_token_mtime, _drive_service_owner
+    with _drive_service_lock:
+        if _drive_service is not None and _token_mtime() == _drive_service_token_mtime:
+            return _drive_service
+        
+        service = _build_google_drive_service(interactive)
+        if service is not None:
+            _drive_service, _drive_service_token_mtime = service, _token_mtime()
+            _drive_service_owner = threading.get_ident()
+        return service
+
+def _migrate_legacy_token():
+    """Convert a pickled token from earlier versions to TOKEN_FILE once, so users aren't asked to sign in again"""
+    if os.path.exists(TOKEN_FILE) or not os.path.exists(LEGACY_TOKEN_FILE):
+        return
+    import pickle
+    
+    try:
+        # Only ever a file this app wrote itself, next to app.py
+        with open(LEGACY_TOKEN_FILE, 'rb') as token:
+            creds = pickle.load(token)
+        temp_token = TOKEN_FILE + '.tmp'
+        with open(temp_token, 'w') as token:
+            token.write(creds.to_json())
+        os.replace(temp_token, TOKEN_FILE)
+    except Exception as e:
+        logger.warning("⚠️ Could not migrate %s, sign-in will be needed: %s", LEGACY_TOKEN_FILE, e)
+        return
+    os.remove(LEGACY_TOKEN_FILE)
+    logger.info("🔑 Migrated %s to %s", LEGACY_TOKEN_FILE, TOKEN_FILE)
+
+def _build_google_drive_service(interactive=True):
+    """Load (or obtain) OAuth credentials and build a Drive client"""
+    # The Google client libraries are heavy; only import them once Drive is actually used
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+    
     creds = None
+    saved_token = None
+    _migrate_legacy_token()
     
     # Check if token file exists
     if os.path.exists(TOKEN_FILE):
-        with open(TOKEN_FILE, 'rb') as token:
-            creds = pickle.load(token)
+        with open(TOKEN_FILE) as token:
+            saved_token = token.read()
+        creds = Credentials.from_authorized_user_info(json.loads(saved_token), SCOPES)
     
     # If no valid credentials, authenticate
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             creds.refresh(Request())
         else:
+            if not interactive:
+                logger.info("🔑 Saved Google Drive token can't be refreshed; sign-in needed")
+                return None
             if not os.path.exists(CREDENTIALS_FILE):
                 logger.warning("⚠️ Google Drive credentials file not found. Local Google Drive integration disabled.")
                 return None
@@ -47,89 +218,316 @@ def get_google_drive_service():
             flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
             creds = flow.run_local_server(port=0)
         
-        # Save credentials for next run
-        with open(TOKEN_FILE, 'wb') as token:
-            pickle.dump(creds, token)
+        # Save credentials for next run; write a temp file and rename so a crash can't leave a torn token.
+        # Leave an unchanged token alone so its mtime (which keys the cached client) stays put.
+        new_token = creds.to_json()
+        if new_token != saved_token:
+            temp_token = TOKEN_FILE + '.tmp'
+            with open(temp_token, 'w') as token:
+                token.write(new_token)
+            os.replace(temp_token, TOKEN_FILE)
     
-    return build('drive', 'v3', credentials=creds)
+    # The v3 discovery document ships with the client library; don't fetch or cache it over HTTP
+    return build('drive', 'v3', credentials=creds, cache_discovery=False, static_discovery=True)
 
 def list_drive_videos(service, folder_id=None):
     """List video files from Google Drive"""
+    cached = _drive_list_cache.get(folder_id)
+    if cached and time.monotonic() - cached[0] < DRIVE_LIST_TTL:
+        return list(cached[1])
+    
     try:
         query = "mimeType contains 'video/'"
         if folder_id:
             query += f" and '{folder_id}' in parents"
         
-        results = service.files().list(
-            q=query,
-            pageSize=50,
-            fields="nextPageToken, files(id, name, size, mimeType, parents)"
-        ).execute()
+        # Ask for Drive's maximum page size and only follow nextPageToken when a folder has more
+        items = []
+        page_token = None
+        while True:
+            results = service.files().list(
+                q=query,
+                pageSize=1000,
+                pageToken=page_token,
+                fields="nextPageToken, files(id, name, size, md5Checksum)"
+            ).execute()
+            items.extend(results.get('files', []))
+            page_token = results.get('nextPageToken')
+            if not page_token or len(items) >= DRIVE_LIST_LIMIT:
+                break
         
-        items = results.get('files', [])
-        return items
+        # Shortcuts and some uploads come back without a size; fill them in with one batched request
+        missing = [item['id'] for item in items if 'size' not in item]
+        if missing:
+            metadata = batch_get_metadata(service, missing)
+            for item in items:
+                item.update(metadata.get(item['id'], {}))
+        _drive_list_cache[folder_id] = (time.monotonic(), items)
+        return list(items)
     except Exception as e:
-        logger.error(f"❌ Error listing Drive videos: {e}")
+        logger.error("❌ Error listing Drive videos: %s", e)
         return []
 
+def _listed_file_info(file_id):
+    """Metadata for file_id from a still-fresh listing or metadata lookup, or None"""
+    now = time.monotonic()
+    cached = _drive_meta_cache.get(file_id)
+    if cached and now - cached[0] < DRIVE_LIST_TTL:
+        return cached[1]
+    for fetched_at, items in list(_drive_list_cache.values()):
+        if now - fetched_at >= DRIVE_LIST_TTL:
+            continue
+        for item in items:
+            if item['id'] == file_id and 'size' in item and 'md5Checksum' in item:
+                return item
+    return None
+
+def _remember_file_info(file_id, file_info):
+    """Store files().get() metadata for _listed_file_info, evicting the oldest entry when full"""
+    _drive_meta_cache.pop(file_id, None)
+    if len(_drive_meta_cache) >= DRIVE_META_CACHE_SIZE:
+        _drive_meta_cache.pop(next(iter(_drive_meta_cache)), None)
+    _drive_meta_cache[file_id] = (time.monotonic(), file_info)
+
+def prefetch_drive_list():
+    """Warm the Drive client and video listing on page load, if the user has already signed in"""
+    # Never start the OAuth browser flow from here: it would block a worker on every page load
+    if not GOOGLE_DRIVE_AVAILABLE or not (os.path.exists(TOKEN_FILE) or os.path.exists(LEGACY_TOKEN_FILE)):
+        return
+    try:
+        service = get_google_drive_service(interactive=False)
+        if service:
+            list_drive_videos(service)
+    except Exception as e:
+        logger.warning("⚠️ Drive prefetch failed: %s", e)
+
+def batch_get_metadata(service, file_ids, fields='id,name,size,md5Checksum'):
+    """Fetch metadata for many Drive files using batched HTTP requests; returns {file_id: metadata}"""
+    metadata = {}
+    
+    def collect(request_id, response, exception):
+        if exception is not None:
+            logger.warning("⚠️ Could not fetch metadata for %s: %s", request_id, exception)
+        else:
+            metadata[request_id] = response
+    
+    # The Drive batch endpoint accepts at most 100 calls per request
+    for i in range(0, len(file_ids), 100):
+        batch = service.new_batch_http_request(callback=collect)
+        for file_id in file_ids[i:i + 100]:
+            batch.add(service.files().get(fileId=file_id, fields=fields), request_id=file_id)
+        batch.execute()
+    return metadata
+
 def extract_drive_file_id(input_str):
     """Extract file ID from Drive link or return input if it's already a file ID"""
-    import re
-    
     if not input_str:
         return None
     
     input_str = input_str.strip()
-    logger.info(f"🔍 Extracting file ID from: {input_str}")
-    
-    # Check if it's a Drive link - more comprehensive patterns
-    drive_link_patterns = [
-        r'https://drive\.google\.com/file/d/([a-zA-Z0-9-_]+)',
-        r'https://drive\.google\.com/open\?id=([a-zA-Z0-9-_]+)',
-        r'https://docs\.google\.com/file/d/([a-zA-Z0-9-_]+)',
-        r'drive\.google\.com/file/d/([a-zA-Z0-9-_]+)',  # Without https
-        r'id=([a-zA-Z0-9-_]+)',  # Just the ID parameter
-        r'/d/([a-zA-Z0-9-_]+)/'  # Pattern with /d/ and trailing slash
-    ]
-    
-    for pattern in drive_link_patterns:
-        match = re.search(pattern, input_str)
-        if match:
-            file_id = match.group(1)
-            logger.info(f"✅ Extracted file ID: {file_id}")
-            return file_id
+    logger.info("🔍 Extracting file ID from: %s", input_str)
     
-    # Check if it's already a file ID (alphanumeric string with hyphens/underscores)
-    if re.match(r'^[a-zA-Z0-9-_]{25,}$', input_str):  # At least 25 chars for Drive file IDs
-        logger.info(f"✅ Using direct file ID: {input_str}")
+    # Most inputs are IDs pasted on their own; an anchored match settles those without scanning for links
+    if _DRIVE_BARE_ID_RE.fullmatch(input_str):
+        logger.info("✅ Using direct file ID: %s", input_str)
         return input_str
     
-    logger.warning(f"❌ Could not extract file ID from: {input_str}")
+    match = _DRIVE_LINK_RE.search(input_str)
+    if match:
+        file_id = match.group(1)
+        logger.info("✅ Extracted file ID: %s", file_id)
+        return file_id
+    
+    logger.warning("❌ Could not extract file ID from: %s", input_str)
     return None
 
-def download_from_drive(service, file_id, filename):
-    """Download a file from Google Drive"""
+def _fetch_range(session, uri, fd, offset, last):
+    """GET bytes [offset, last] of a Drive media URI and pwrite them in place; returns bytes written"""
+    response = session.get(uri, headers={'Range': f'bytes={offset}-{last}'}, stream=True)
+    response.raise_for_status()
+    position = offset
+    for block in response.iter_content(chunk_size=1024 * 1024):
+        os.pwrite(fd, block, position)
+        position += len(block)
+    return position - offset
+
+def _drive_media_session(credentials):
+    """Shared AuthorizedSession for media Range GETs, so downloads reuse pooled keep-alive TLS connections"""
+    global _drive_media_session_cached
+    with _drive_service_lock:
+        cached = _drive_media_session_cached
+        if cached is not None and cached.credentials is credentials:
+            return cached
+        
+        from google.auth.transport.requests import AuthorizedSession
+        from requests.adapters import HTTPAdapter
+        
+        session = AuthorizedSession(credentials)
+        # One pooled connection per download worker, plus the speculative head fetch
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=DRIVE_DOWNLOAD_WORKERS + 1)
+        session.mount('https://', adapter)
+        # A replaced session is left for garbage collection; a download may still be using it
+        _drive_media_session_cached = session
+        return session
+
+def _download_ranges(service, file_id, temp_file, size, start=0):
+    """Fetch a Drive file from start onwards as concurrent byte ranges written in place with pwrite"""
+    uri = service.files().get_media(fileId=file_id).uri
+    session = _drive_media_session(service._http.credentials)
+    fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT, 0o644)
     try:
-        request = service.files().get_media(fileId=file_id)
+        # Reserve the whole file up front so the out-of-order range writes don't fragment it
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(fd, 0, size)
+        else:
+            os.ftruncate(fd, size)
+        
+        def fetch_range(offset):
+            last = min(offset + DRIVE_RANGE_BYTES, size) - 1
+            received = _fetch_range(session, uri, fd, offset, last)
+            if received != last - offset + 1:
+                raise IOError(f"Short read for bytes {offset}-{last}: got {received}")
+        
+        with ThreadPoolExecutor(max_workers=DRIVE_DOWNLOAD_WORKERS) as pool:
+            for done, _ in enumerate(pool.map(fetch_range, range(start, size, DRIVE_RANGE_BYTES)), 1):
+                logger.info("📥 Download progress: %d%%", min(100, (start + done * DRIVE_RANGE_BYTES) * 100 // size))
+    finally:
+        os.close(fd)
+
+def _prefetch_head(service, file_id, partial_file):
+    """Download the first range of a Drive file before its name and size are known; returns bytes written"""
+    uri = service.files().get_media(fileId=file_id).uri
+    session = _drive_media_session(service._http.credentials)
+    fd = os.open(partial_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        return _fetch_range(session, uri, fd, 0, DRIVE_RANGE_BYTES - 1)
+    finally:
+        os.close(fd)
+
+def download_from_drive(service, file_id, filename, size=None, prefetched=None):
+    """Download a file from Google Drive, continuing from a (partial_file, bytes) head if given"""
+    try:
+        if size is None:
+            size = service.files().get(fileId=file_id, fields='size').execute().get('size')
+        size = int(size) if size else 0
+        
+        if prefetched:
+            # Keep the bytes already fetched and resume the range download after them
+            partial_file, received = prefetched
+            temp_file = os.path.join(os.path.dirname(partial_file), filename)
+            os.replace(partial_file, temp_file)
+            if received < size:
+                _download_ranges(service, file_id, temp_file, size, start=received)
+            logger.info("✅ Downloaded: %s", filename)
+            return temp_file
         
         # Create temporary file
         temp_dir = tempfile.mkdtemp()
         temp_file = os.path.join(temp_dir, filename)
         
-        with open(temp_file, 'wb') as fh:
-            downloader = MediaIoBaseDownload(fh, request)
+        if size > DRIVE_RANGE_BYTES and hasattr(os, 'pwrite'):
+            _download_ranges(service, file_id, temp_file, size)
+            logger.info("✅ Downloaded: %s", filename)
+            return temp_file
+        
+        # Small files (or files Drive reports no size for) take the simple sequential path
+        from googleapiclient.http import MediaIoBaseDownload
+        request = service.files().get_media(fileId=file_id)
+        with open(temp_file, 'wb', buffering=4 * 1024 * 1024) as fh:
+            downloader = MediaIoBaseDownload(fh, request, chunksize=DRIVE_DOWNLOAD_CHUNK_BYTES)
             done = False
             while done is False:
                 status, done = downloader.next_chunk()
                 if status:
-                    logger.info(f"📥 Download progress: {int(status.progress() * 100)}%")
+                    logger.info("📥 Download progress: %d%%", status.progress() * 100)
         
-        logger.info(f"✅ Downloaded: {filename}")
+        logger.info("✅ Downloaded: %s", filename)
         return temp_file
     except Exception as e:
-        logger.error(f"❌ Error downloading from Drive: {e}")
+        logger.error("❌ Error downloading from Drive: %s", e)
         return None
 
+def _fetch_info_and_head(service, file_id):
+    """Fetch file metadata and the first byte range concurrently; returns (file_info, prefetched)"""
+    if not hasattr(os, 'pwrite'):
+        return service.files().get(fileId=file_id, fields=DRIVE_FILE_FIELDS).execute(), None
+    
+    partial_dir = tempfile.mkdtemp()
+    partial_file = os.path.join(partial_dir, f"{file_id}.part")
+    prefetched = None
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            head_future = pool.submit(_prefetch_head, service, file_id, partial_file)
+            file_info = service.files().get(fileId=file_id, fields=DRIVE_FILE_FIELDS).execute()
+            try:
+                prefetched = (partial_file, head_future.result())
+            except Exception as e:
+                # Not fatal: download_from_drive will report it if the media really can't be fetched
+                logger.warning("⚠️ Speculative Drive download failed: %s", e)
+    finally:
+        # The partial file is only handed on when the head fetch succeeded; otherwise drop its directory
+        if prefetched is None:
+            shutil.rmtree(partial_dir, ignore_errors=True)
+    return file_info, prefetched
+
+def cache_get_or_download(service, file_id):
+    """Return (local_path, filename) for a Drive file, reusing the local cache when its checksum matches"""
+    cached_entries = list(DRIVE_CACHE_DIR.glob(f"{file_id}_*"))
+    file_info = _listed_file_info(file_id)
+    if file_info is not None:
+        # Already known from a recent listing or lookup; no metadata round-trip needed
+        prefetched = None
+    else:
+        if cached_entries:
+            # Only a metadata call is needed to validate a cached copy, so skip the speculative download
+            file_info, prefetched = service.files().get(fileId=file_id, fields=DRIVE_FILE_FIELDS).execute(), None
+        else:
+            file_info, prefetched = _fetch_info_and_head(service, file_id)
+        _remember_file_info(file_id, file_info)
+    filename = file_info['name']
+    
+    md5 = file_info.get('md5Checksum')
+    cache_path = DRIVE_CACHE_DIR / f"{file_id}_{md5}" / filename if md5 else None
+    if cache_path and cache_path.exists():
+        logger.info("♻️ Using cached Drive download: %s", cache_path)
+        # The entry directory's mtime records last use, for prune_drive_cache
+        os.utime(cache_path.parent)
+        return str(cache_path), filename
+    
+    temp_file = download_from_drive(service, file_id, filename, file_info.get('size'), prefetched)
+    if not temp_file or not cache_path:
+        return temp_file, filename
+    
+    # Keep the download for next time, replacing copies of older revisions of the same file
+    for stale in cached_entries:
+        shutil.rmtree(stale, ignore_errors=True)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(temp_file, cache_path)
+    shutil.rmtree(os.path.dirname(temp_file), ignore_errors=True)
+    prune_drive_cache(keep=cache_path.parent)
+    return str(cache_path), filename
+
+def prune_drive_cache(keep=None):
+    """Evict least recently used Drive downloads until the cache fits DRIVE_CACHE_MAX_BYTES"""
+    entries = []
+    total = 0
+    for entry in DRIVE_CACHE_DIR.iterdir():
+        try:
+            size = sum(f.stat().st_size for f in entry.iterdir())
+            entries.append((entry.stat().st_mtime, size, entry))
+        except OSError:
+            continue
+        total += size
+    
+    for _, size, entry in sorted(entries, key=lambda e: e[0]):
+        if total <= DRIVE_CACHE_MAX_BYTES:
+            break
+        if entry == keep:
+            continue
+        logger.info("🧹 Evicting cached Drive download: %s", entry)
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+
 def load_video_from_path_or_drive(input_path):
     """Load video from local path or Google Drive"""
     if not input_path:
@@ -147,122 +545,384 @@ def load_video_from_path_or_drive(input_path):
             if not service:
                 return None, "❌ Google Drive service not available. Check oauth_credentials.json"
             
-            # Get file info
-            file_info = service.files().get(fileId=file_id).execute()
-            filename = file_info['name']
-            
-            # Download file
-            temp_file = download_from_drive(service, file_id, filename)
+            # Download file (or reuse an unchanged cached copy)
+            temp_file, filename = cache_get_or_download(service, file_id)
             if temp_file:
                 return temp_file, f"✅ Downloaded from Drive: {filename}"
             else:
                 return None, f"❌ Failed to download from Drive"
         except Exception as e:
-            logger.error(f"❌ Error loading from Drive: {e}")
+            logger.error("❌ Error loading from Drive: %s", e)
             return None, f"❌ Drive error: {str(e)}"
     
     return None, f"❌ Invalid path or Drive link: {input_path}"
 
-def process_video_trim(video_file, start_time, end_time):
-    """Process video trimming using the trim-convert.sh script"""
-    logger.info(f"🎬 Starting trim process: file={video_file}, start={start_time}, end={end_time}")
+def make_temp_dir(session_hash=None):
+    """Create a temp directory for trim outputs under the session's scratch directory"""
+    session_dir = os.path.join(_scratch_root, session_hash or "shared")
+    ensure_dir(session_dir)
+    return tempfile.mkdtemp(dir=session_dir)
+
+def cleanup_session_dir(request: gr.Request):
+    """Remove a browser session's trim outputs once the session ends"""
+    if request and request.session_hash:
+        session_dir = os.path.join(_scratch_root, request.session_hash)
+        shutil.rmtree(session_dir, ignore_errors=True)
+        _created_dirs.discard(session_dir)
+
+@atexit.register
+def _cleanup_temp_dirs():
+    shutil.rmtree(_scratch_root, ignore_errors=True)
+
+async def _drain_lines(stream, sink):
+    """Read a subprocess pipe to EOF, appending each line to sink"""
+    async for line in stream:
+        sink.append(line)
+
+async def stream_ffmpeg(cmd, duration=None):
+    """Run ffmpeg, yielding (None, None, progress) updates and finally (returncode, log, None)
+
+    Progress comes from ffmpeg's machine-readable -progress output on stdout and is shown as a
+    percentage of duration when that is known; stderr only carries warnings and errors.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        close_fds=False
+    )
+    # Keep only the tail of stderr so a chatty ffmpeg can't grow memory without bound
+    stderr_tail = deque(maxlen=FFMPEG_STDERR_TAIL_LINES)
+    stderr_task = asyncio.create_task(_drain_lines(proc.stderr, stderr_tail))
+    
+    try:
+        out_time = None
+        async for raw_line in proc.stdout:
+            key, _, value = raw_line.decode(errors="replace").strip().partition("=")
+            if key == "out_time_us" and value.isdigit():
+                out_time = int(value) / 1_000_000
+            elif key == "progress" and out_time is not None:
+                # Each progress block ends with progress=continue|end; report once per block
+                if duration:
+                    yield None, None, f"{min(100, int(out_time * 100 / duration))}%"
+                else:
+                    yield None, None, format_time(out_time)
+        
+        await stderr_task
+        stderr = b"".join(stderr_tail).decode(errors="replace").strip()
+        await proc.wait()
+        yield proc.returncode, stderr, None
+    finally:
+        # Closed or cancelled early (e.g. the client went away): don't leave ffmpeg running
+        # after the caller has given its job slot back
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        stderr_task.cancel()
+
+def _stat(path):
+    """os.stat that returns None instead of raising when the file does not exist"""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+def build_trim_command(video_file, start_seconds, end_seconds, output_video, output_audio, reencode=False):
+    """Build the ffmpeg command that writes the trimmed video and its AAC track in one pass
+
+    Pass output_audio=None for inputs without an audio stream; only the video is written then.
+    """
+    if reencode:
+        # Slow path for sources whose streams cannot be copied into MP4/ADTS
+        video_codec = ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "17", "-c:a", "aac", "-b:a", "128k"]
+        audio_codec = ["-c:a", "aac", "-b:a", "128k"]
+    else:
+        # Stream copy: a demux/remux of the selected range, no decode or encode
+        video_codec = ["-c", "copy"]
+        audio_codec = ["-c:a", "copy"]
+    
+    threads = FFMPEG_THREADS_ARG
+    audio_map = ["-map", "0:a:0"] if output_audio else []
+    cmd = [
+        *FFMPEG_PREFIX,
+        # ffmpeg takes plain seconds, so no HH:MM:SS formatting is needed
+        "-ss", f"{start_seconds:.3f}",
+        "-to", f"{end_seconds:.3f}",
+        "-i", video_file,
+        "-map", "0:v:0", *audio_map, *video_codec, "-threads", threads,
+        "-avoid_negative_ts", "make_zero", "-movflags", "+faststart", output_video,
+    ]
+    if output_audio:
+        cmd += ["-map", "0:a:0", "-vn", *audio_codec, "-threads", threads, output_audio]
+    return cmd
+
+def build_audio_command(video_file, output_audio):
+    """Build the ffmpeg command that only copies the audio track out of a video"""
+    return [
+        *FFMPEG_PREFIX,
+        "-i", video_file,
+        "-map", "0:a:0", "-vn", "-c:a", "copy", "-threads", FFMPEG_THREADS_ARG, output_audio
+    ]
+
+def ensure_dir(path):
+    """os.makedirs(path, exist_ok=True), skipping the syscalls for directories this process already created"""
+    if path not in _created_dirs:
+        os.makedirs(path, exist_ok=True)
+        _created_dirs.add(path)
+
+def _remove_file(path):
+    """Unlink path if it exists, so the next writer creates a fresh inode instead of truncating a shared one"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+def clear_output(path):
+    """Remove a previous output at path, re-creating its directory if it was deleted while we ran"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        # Only reached when there is no previous output, so this stat is off the repeat-trim path
+        parent = os.path.dirname(path)
+        if not os.path.isdir(parent):
+            # ensure_dir() still remembers the directory; forget it and create it again
+            _created_dirs.discard(parent)
+            ensure_dir(parent)
+
+def link_or_copy(src, dst):
+    """Hard-link src to dst, copying instead when they are on different filesystems"""
+    _remove_file(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        try:
+            shutil.copyfile(src, dst)
+        except shutil.SameFileError:
+            pass  # dst already is src; nothing to copy
+
+def fast_copy(src, dst):
+    """Copy src to dst in the kernel (copy_file_range, reflinks where supported), keeping metadata like copy2"""
+    # Opening dst for writing would truncate src if they are the same file; refuse like shutil.copy2 does
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                shutil.copystat(src, dst)
+                return dst
+        except OSError:
+            pass  # e.g. EXDEV on older kernels; fall through to the sendfile-based copy
+    
+    shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
+async def process_video_trim(video_file, start_time, end_time, reencode=False, dst_dir=None, request: gr.Request = None):
+    """Trim video and extract its audio track with a single ffmpeg invocation, streaming progress.
+
+    Stream copy is used unless reencode is set (frame-accurate but slower). Outputs go to dst_dir
+    when given (so callers never have to move them), otherwise to a fresh temp dir.
+    """
+    logger.info("🎬 Starting trim process: file=%s, start=%s, end=%s", video_file, start_time, end_time)
     
     if not video_file or start_time is None or end_time is None:
         error_msg = "Please provide video file and both start/end times"
-        logger.error(f"❌ {error_msg}")
-        return None, None, None, error_msg
+        logger.error("❌ %s", error_msg)
+        yield None, None, None, error_msg
+        return
     
     try:
         start_seconds = float(start_time)
         end_seconds = float(end_time)
         
-        logger.info(f"📊 Parsed times: start={start_seconds}s, end={end_seconds}s")
+        logger.info("📊 Parsed times: start=%ss, end=%ss", start_seconds, end_seconds)
         
         if start_seconds >= end_seconds:
             error_msg = "Start time must be less than end time"
-            logger.error(f"❌ {error_msg}")
-            return None, None, None, error_msg
+            logger.error("❌ %s", error_msg)
+            yield None, None, None, error_msg
+            return
         
         if not os.path.exists(video_file):
             error_msg = f"Input video file not found: {video_file}"
-            logger.error(f"❌ {error_msg}")
-            return None, None, None, error_msg
+            logger.error("❌ %s", error_msg)
+            yield None, None, None, error_msg
+            return
         
-        # Create temporary directory for output
-        temp_dir = tempfile.mkdtemp()
-        logger.info(f"📁 Created temp directory: {temp_dir}")
+        if dst_dir:
+            ensure_dir(dst_dir)
+            output_dir = dst_dir
+        else:
+            # Create temporary directory for output
+            output_dir = make_temp_dir(request.session_hash if request else None)
+            logger.info("📁 Created temp directory: %s", output_dir)
         
         # Get the base filename without extension
-        base_name = Path(video_file).stem
-        output_prefix = os.path.join(temp_dir, f"{base_name}_trimmed")
+        base_name = os.path.splitext(os.path.basename(video_file))[0]
+        output_prefix = os.path.join(output_dir, f"{base_name}_trimmed")
         
-        # The script will create these files based on the prefix
+        # ffmpeg writes both outputs next to each other in the output directory
         output_video = f"{output_prefix}.mp4"
         output_audio = f"{output_prefix}.aac"
         
-        logger.info(f"📤 Output files will be: video={output_video}, audio={output_audio}")
+        # Silent inputs only get a video output; asking ffmpeg for their audio would fail both the
+        # stream copy and the re-encode fallback
+        if not await asyncio.to_thread(has_audio_stream, video_file):
+            logger.info("🔇 Input has no audio stream, writing the video only")
+            output_audio = None
         
-        # Check if trim-convert.sh script exists
-        script_path = "./trim-convert.sh"
-        if not os.path.exists(script_path):
-            error_msg = f"trim-convert.sh script not found at: {script_path}"
-            logger.error(f"❌ {error_msg}")
-            return None, None, None, error_msg
+        logger.info("📤 Output files will be: video=%s, audio=%s", output_video, output_audio)
         
-        # Convert seconds to HH:MM:SS format for the script
-        def seconds_to_time(seconds):
-            hours = int(seconds // 3600)
-            minutes = int((seconds % 3600) // 60)
-            secs = seconds % 60
-            return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
+        # An earlier full-range trim may have left output_video as a hard link to a source video;
+        # ffmpeg -y and PyAV truncate in place, so drop old outputs rather than write through them
+        for path in (output_video, output_audio):
+            if path:
+                clear_output(path)
         
-        start_time_str = seconds_to_time(start_seconds)
-        end_time_str = seconds_to_time(end_seconds)
+        # Whole MP4 selected: publish the source as the trimmed video and only extract the audio
+        duration = await asyncio.to_thread(get_video_duration, video_file)
+        if (duration and start_seconds <= FULL_RANGE_TOLERANCE and end_seconds >= duration - FULL_RANGE_TOLERANCE
+                and os.path.splitext(video_file)[1].lower() == ".mp4"):
+            logger.info("⚡ Full range selected, skipping the video remux")
+            returncode, stderr = 0, ""
+            if output_audio:
+                async with _ffmpeg_semaphore:
+                    async with contextlib.aclosing(stream_ffmpeg(build_audio_command(video_file, output_audio), duration)) as updates:
+                        async for returncode, stderr, progress in updates:
+                            if progress:
+                                yield None, None, None, f"🎵 Extracting audio... {progress}"
+            
+            if returncode == 0:
+                # Only hard-link into our private scratch dir; a caller's folder gets an independent copy
+                publish = fast_copy if dst_dir else link_or_copy
+                await asyncio.to_thread(publish, video_file, output_video)
+                if output_audio:
+                    success_msg = f"✅ Full video selected ({duration:.1f}s), extracted audio without re-trimming"
+                else:
+                    success_msg = f"✅ Full video selected ({duration:.1f}s); it has no audio track"
+                logger.info(success_msg)
+                yield output_video, output_audio, output_audio, success_msg
+                return
+            logger.warning("⚠️ Audio-only extraction failed, running a full trim: %s", stderr)
         
-        logger.info(f"🕒 Converted times: start={start_time_str}, end={end_time_str}")
+        logger.info("🕒 Trim range: start=%.3fs, end=%.3fs", start_seconds, end_seconds)
         
-        # Call the trim-convert.sh script with proper format
-        cmd = [
-            "bash", script_path,
-            "-s", start_time_str,
-            "-e", end_time_str, 
-            "-o", output_prefix,
-            video_file
-        ]
+        cmd = build_trim_command(video_file, start_seconds, end_seconds, output_video, output_audio, reencode=reencode)
         
-        logger.info(f"🚀 Running command: {' '.join(cmd)}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🚀 Running command: %s", shlex.join(cmd))
         
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd='.')
+        yield None, None, None, "⏳ Waiting for ffmpeg..."
         
-        logger.info(f"📋 Command finished with return code: {result.returncode}")
-        logger.info(f"📤 STDOUT: {result.stdout}")
-        if result.stderr:
-            logger.warning(f"⚠️  STDERR: {result.stderr}")
+        # Queue behind other sessions' jobs once MAX_FFMPEG_JOBS are already running
+        async with _ffmpeg_semaphore:
+            returncode = None
+            if TRIM_BACKEND == "pyav" and media_utils.av is not None and not reencode:
+                try:
+                    yield None, None, None, "✂️ Trimming in-process (PyAV)..."
+                    await asyncio.to_thread(trim_with_pyav, video_file, start_seconds, end_seconds, output_video, output_audio)
+                    returncode, stderr = 0, ""
+                except Exception as e:
+                    logger.warning("⚠️ PyAV trim failed, falling back to ffmpeg: %s", e)
+            
+            if returncode is None:
+                async with contextlib.aclosing(stream_ffmpeg(cmd, end_seconds - start_seconds)) as updates:
+                    async for returncode, stderr, progress in updates:
+                        if progress:
+                            label = "Re-encoding" if reencode else "Trimming (stream copy)"
+                            yield None, None, None, f"✂️ {label}... {progress}"
+            
+            if returncode != 0 and not reencode:
+                # Same fallback as trim-convert.sh: re-encode when stream copy is not possible
+                logger.warning("⚠️ Stream copy failed, retrying with re-encoding: %s", stderr)
+                cmd = build_trim_command(video_file, start_seconds, end_seconds, output_video, output_audio, reencode=True)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("🚀 Running command: %s", shlex.join(cmd))
+                async with contextlib.aclosing(stream_ffmpeg(cmd, end_seconds - start_seconds)) as updates:
+                    async for returncode, stderr, progress in updates:
+                        if progress:
+                            yield None, None, None, f"✂️ Re-encoding... {progress}"
         
-        if result.returncode == 0:
-            # Check if files were created
-            video_exists = os.path.exists(output_video)
-            audio_exists = os.path.exists(output_audio)
+        logger.info("📋 Command finished with return code: %s", returncode)
+        if stderr and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("⚠️  STDERR: %s", stderr)
+        
+        if returncode == 0:
+            # Check if files were created (one stat each gives both existence and size)
+            video_stat = _stat(output_video)
+            audio_stat = _stat(output_audio) if output_audio else None
             
-            logger.info(f"📁 File check: video_exists={video_exists}, audio_exists={audio_exists}")
+            logger.info("📁 File check: video=%s bytes, audio=%s bytes",
+                        video_stat and video_stat.st_size, audio_stat and audio_stat.st_size)
             
-            if video_exists and audio_exists:
+            if video_stat and (audio_stat or not output_audio):
                 success_msg = f"✅ Successfully trimmed video from {start_seconds:.1f}s to {end_seconds:.1f}s"
+                if not output_audio:
+                    success_msg += " (no audio track)"
                 logger.info(success_msg)
-                return output_video, output_audio, output_audio, success_msg
+                yield output_video, output_audio, output_audio, success_msg
             else:
-                error_msg = f"❌ Output files not created.\n\nScript STDOUT:\n{result.stdout}\n\nScript STDERR:\n{result.stderr}"
+                error_msg = f"❌ Output files not created.\n\nffmpeg STDERR:\n{stderr}"
                 logger.error(error_msg)
-                return None, None, None, error_msg
+                yield None, None, None, error_msg
         else:
-            error_msg = f"❌ trim-convert.sh failed with return code {result.returncode}\n\nSTDOUT:\n{result.stdout}\n\nSTDERR:\n{result.stderr}"
+            error_msg = f"❌ ffmpeg failed with return code {returncode}\n\nSTDERR:\n{stderr}"
             logger.error(error_msg)
-            return None, None, None, error_msg
+            yield None, None, None, error_msg
             
     except Exception as e:
         error_msg = f"❌ Unexpected error: {str(e)}"
         logger.exception(error_msg)
-        return None, None, None, error_msg
+        yield None, None, None, error_msg
+
+def run_tool(cmd):
+    """Run a short ffmpeg/ffprobe command and capture its output
+
+    close_fds=False lets CPython start the child with posix_spawn instead of fork + closing
+    every descriptor the server has open.
+    """
+    return subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL, close_fds=False)
+
+def warm_ffmpeg():
+    """Run ffmpeg/ffprobe once so their shared libraries are in the page cache before the first upload"""
+    for binary in (FFPROBE, FFMPEG):
+        try:
+            run_tool([binary, "-version"])
+        except OSError as e:
+            logger.warning("⚠️ Could not run %s: %s", binary, e)
+
+def has_audio_stream(video_file):
+    """Whether the video has an audio stream; assumes it does if the file can't be probed"""
+    try:
+        st = os.stat(video_file)
+    except OSError:
+        return True
+    return _has_audio_cached(os.path.realpath(video_file), st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=128)
+def _has_audio_cached(video_file, mtime_ns, size):
+    """Probe for an audio stream once per (path, mtime, size)"""
+    cmd = [
+        FFPROBE, "-hide_banner", "-v", "error", "-select_streams", "a:0",
+        "-show_entries", "stream=index", "-of", "csv=p=0", video_file
+    ]
+    try:
+        result = run_tool(cmd)
+    except OSError as e:
+        logger.warning("⚠️ Could not probe audio streams: %s", e)
+        return True
+    if result.returncode != 0:
+        logger.warning("⚠️ Could not probe audio streams: %s", result.stderr)
+        return True
+    return bool(result.stdout.strip())
 
 def get_video_duration(video_file):
     """Get video duration in seconds"""
@@ -270,54 +930,173 @@ def get_video_duration(video_file):
         return 0
     
     try:
-        logger.info(f"📺 Getting duration for: {video_file}")
+        st = os.stat(video_file)
+    except OSError as e:
+        logger.warning("⚠️ Could not stat video file: %s", e)
+        return 0
+    
+    # Keyed on file identity, so an edited or replaced file is probed again
+    return _duration_cached(os.path.realpath(video_file), st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=128)
+def _duration_cached(video_file, mtime_ns, size):
+    """Probe video duration once per (path, mtime, size)"""
+    # Fast path: read the duration straight from the container header; any parse failure
+    # falls through to ffprobe rather than caching a 0
+    try:
+        duration = read_container_duration(video_file)
+    except Exception as e:
+        logger.warning("⚠️ Header duration parse failed, using ffprobe: %s", e)
+        duration = None
+    if duration:
+        logger.info("⏱️ Video duration (header): %s seconds", duration)
+        return duration
+    
+    try:
+        logger.info("📺 Getting duration for: %s", video_file)
         
         cmd = [
-            "ffprobe", "-v", "quiet", "-print_format", "json", 
-            "-show_format", "-show_streams", video_file
+            FFPROBE, "-hide_banner", "-v", "error", "-show_entries", "format=duration",
+            "-of", "default=nw=1:nk=1", video_file
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_tool(cmd)
         
         if result.returncode == 0:
-            import json
-            data = json.loads(result.stdout)
-            duration = float(data['format']['duration'])
-            logger.info(f"⏱️ Video duration: {duration} seconds")
+            duration = float(result.stdout.strip())
+            logger.info("⏱️ Video duration: %s seconds", duration)
             return duration
         else:
-            logger.warning(f"⚠️ Could not get duration: {result.stderr}")
+            logger.warning("⚠️ Could not get duration: %s", result.stderr)
             return 0
     except Exception as e:
-        logger.exception(f"❌ Error getting video duration: {e}")
+        logger.exception("❌ Error getting video duration: %s", e)
         return 0
 
 def format_time(seconds):
     """Format seconds to mm:ss"""
     if seconds is None:
         return "0:00"
-    minutes = int(seconds // 60)
-    secs = int(seconds % 60)
+    minutes, secs = divmod(int(seconds), 60)
     return f"{minutes}:{secs:02d}"
 
-def get_video_info(video_file):
+async def prewarm_video_info(video_file):
+    """Fill the duration and audio-stream caches for a freshly uploaded file in the background"""
+    if video_file:
+        await asyncio.to_thread(get_video_duration, video_file)
+        await asyncio.to_thread(has_audio_stream, video_file)
+
+async def get_video_info(video_file):
     """Get video duration and basic info"""
     if not video_file:
         return "No video uploaded", 0, 0, 0
     
-    logger.info(f"📹 Processing video upload: {video_file}")
+    logger.info("📹 Processing video upload: %s", video_file)
     
-    duration = get_video_duration(video_file)
+    # Probing may fall back to ffprobe, so keep it off the event loop
+    duration = await asyncio.to_thread(get_video_duration, video_file)
     if duration > 0:
-        minutes = int(duration // 60)
-        seconds = int(duration % 60)
-        info = f"📹 Video loaded! Duration: {minutes}:{seconds:02d} ({duration:.1f}s)"
-        logger.info(f"✅ {info}")
+        info = f"📹 Video loaded! Duration: {format_time(duration)} ({duration:.1f}s)"
+        logger.info("✅ %s", info)
         return info, duration, 0, duration
     else:
         info = "📹 Video loaded! (Could not determine duration)"
-        logger.warning(f"⚠️ {info}")
+        logger.warning("⚠️ %s", info)
         return info, 100, 0, 100
 
+# Trim slider resolution in seconds, shared by the initial sliders and the per-load updates
+SLIDER_STEP = 0.1
+
+# Leaves both sliders and both time displays untouched while a load is still probing
+PENDING_SLIDER_UPDATES = (gr.update(), gr.update(), gr.update(), gr.update())
+
+def _mk_slider(duration, value=0.0, step=SLIDER_STEP):
+    """Slider update spanning [0, duration] for a newly loaded video"""
+    return gr.Slider(minimum=0, maximum=duration, value=value, step=step)
+
+async def load_video_updates(video_file, status):
+    """Yield (player, status, info, start slider, end slider, start label, end label) for a loaded video"""
+    # Show the player right away; slider bounds follow once the duration is known
+    yield video_file, status, "⏳ Reading video duration...", *PENDING_SLIDER_UPDATES
+    info, duration, start_val, end_val = await get_video_info(video_file)
+    yield (
+        video_file,  # video player
+        status,      # load status
+        info,        # video info
+        _mk_slider(duration, start_val),  # start slider
+        _mk_slider(duration, end_val),    # end slider
+        format_time(start_val),  # start time display
+        format_time(end_val)     # end time display
+    )
+
+async def load_remote_video(input_path):
+    """Load video from path or Drive link; shared by the main input tab and the legacy Drive tab"""
+    if not input_path:
+        yield None, "Please enter a file path or Drive link", "No video loaded", None, None, None, None
+        return
+    
+    temp_file, status = await asyncio.to_thread(load_video_from_path_or_drive, input_path)
+    if not temp_file:
+        yield None, status, "Failed to load video", None, None, None, None
+        return
+    
+    async for update in load_video_updates(temp_file, status):
+        yield update
+
+def build_trim_range():
+    """Create the start/end trim sliders and their m:ss labels; returns the components by name"""
+    start_slider = gr.Slider(
+        minimum=0,
+        maximum=100,
+        value=0,
+        step=SLIDER_STEP,
+        label="⏯️ Start Time",
+        info="Drag to set trim start point",
+        elem_classes=["trim-slider"]
+    )
+    
+    end_slider = gr.Slider(
+        minimum=0,
+        maximum=100,
+        value=100,
+        step=SLIDER_STEP,
+        label="⏹️ End Time",
+        info="Drag to set trim end point",
+        elem_classes=["trim-slider"]
+    )
+    
+    with gr.Row():
+        start_time_display = gr.Textbox(
+            label="⏯️ Start Time",
+            value="0:00",
+            interactive=False,
+            scale=1
+        )
+        
+        end_time_display = gr.Textbox(
+            label="⏹️ End Time",
+            value="1:40",
+            interactive=False,
+            scale=1
+        )
+    
+    # Time labels update in the browser, so dragging costs no server round-trips; seeking is done
+    # by the delegated input listener in the page head
+    for slider, display in ((start_slider, start_time_display), (end_slider, end_time_display)):
+        slider.change(
+            fn=None,
+            inputs=[slider],
+            outputs=[display],
+            js="(time) => window.formatTime(time)",
+            show_progress="hidden"
+        )
+    
+    return {
+        "start_slider": start_slider,
+        "end_slider": end_slider,
+        "start_time_display": start_time_display,
+        "end_time_display": end_time_display,
+    }
+
 # Create the Gradio interface
 custom_css = """
 .video-container video {
@@ -366,36 +1145,76 @@ custom_css = """
 with gr.Blocks(title="Video Trimmer Tool", theme=gr.themes.Soft(), css=custom_css, head="""
 <script>
 // Enhanced video controls
-function seekVideo(time) {
-    const videos = document.querySelectorAll('video');
-    videos.forEach(video => {
+// Live collection: stays current as Gradio swaps video elements in and out, without re-querying the DOM
+const videoElements = document.getElementsByTagName('video');
+
+function forEachReadyVideo(fn) {
+    for (const video of videoElements) {
         if (video.src && video.readyState >= 2) {
-            video.currentTime = time;
+            fn(video);
         }
+    }
+}
+
+// Setting currentTime mid-seek cancels the in-flight decode, so while a video is seeking keep only
+// the latest target and apply it once the current seek lands; frames keep appearing during a drag
+const pendingSeeks = new WeakMap();
+function applyPendingSeek(video) {
+    video.__seekHold = false;
+    if (pendingSeeks.has(video)) {
+        const next = pendingSeeks.get(video);
+        pendingSeeks.delete(video);
+        video.currentTime = next;
+    }
+}
+
+function seekWhenReady(video, time) {
+    if (!video.__seekWired) {
+        video.addEventListener('seeked', () => {
+            // Hold the next seek for one frame so the one that just landed actually gets painted.
+            // (requestVideoFrameCallback would be the natural fit, but it never fires on a paused,
+            // idle video once that frame has already been presented.)
+            video.__seekHold = true;
+            requestAnimationFrame(() => applyPendingSeek(video));
+        });
+        video.__seekWired = true;
+    }
+    if (video.seeking || video.__seekHold) {
+        pendingSeeks.set(video, time);
+    } else {
+        video.currentTime = time;
+    }
+}
+
+// A slider drag fires dozens of events per second; apply at most one seek per animation frame
+let pendingSeekTime = null;
+function seekVideo(time) {
+    const scheduled = pendingSeekTime !== null;
+    pendingSeekTime = time;
+    if (scheduled) return;
+    requestAnimationFrame(() => {
+        const target = pendingSeekTime;
+        pendingSeekTime = null;
+        forEachReadyVideo(video => seekWhenReady(video, target));
     });
 }
 
 function playVideo() {
-    const videos = document.querySelectorAll('video');
-    videos.forEach(video => {
-        if (video.src && video.readyState >= 2) {
-            video.play();
-        }
-    });
+    forEachReadyVideo(video => video.play());
 }
 
 function pauseVideo() {
-    const videos = document.querySelectorAll('video');
-    videos.forEach(video => {
-        if (video.src && video.readyState >= 2) {
-            video.pause();
-        }
-    });
+    forEachReadyVideo(video => video.pause());
+}
+
+// Client-side twin of format_time() in app.py: seconds -> m:ss
+function formatTime(seconds) {
+    const total = Math.floor(seconds || 0);
+    return Math.floor(total / 60) + ':' + String(total % 60).padStart(2, '0');
 }
 
 function getCurrentTime() {
-    const videos = document.querySelectorAll('video');
-    for (let video of videos) {
+    for (const video of videoElements) {
         if (video.src && video.readyState >= 2) {
             return video.currentTime;
         }
@@ -403,25 +1222,14 @@ function getCurrentTime() {
     return 0;
 }
 
-function updateVideoSeek() {
-    const startSlider = document.querySelector('input[type="range"]');
-    const endSlider = document.querySelectorAll('input[type="range"]')[1];
-    
-    if (startSlider && endSlider) {
-        startSlider.addEventListener('input', (e) => {
-            seekVideo(parseFloat(e.target.value));
-        });
-        
-        endSlider.addEventListener('input', (e) => {
-            seekVideo(parseFloat(e.target.value));
-        });
+// One delegated listener seeks for every trim slider (range or number box), including ones Gradio
+// re-renders later, instead of wiring whichever range inputs exist at load time
+document.addEventListener('input', (e) => {
+    if (e.target.matches('input') && e.target.closest('.trim-slider')) {
+        const time = parseFloat(e.target.value);
+        if (!Number.isNaN(time)) seekVideo(time);
     }
-}
-
-// Initialize after DOM loads
-document.addEventListener('DOMContentLoaded', updateVideoSeek);
-// Also try after a delay for dynamic content
-setTimeout(updateVideoSeek, 2000);
+});
 </script>
 """) as demo:
     gr.Markdown("""
@@ -431,7 +1239,7 @@ setTimeout(updateVideoSeek, 2000);
     **Features:**
     - ✂️ **Precise trimming** with visual sliders
     - 🎵 **Audio extraction** (AAC format)
-    - 🚀 **Fast processing** using your proven trim-convert.sh script
+    - 🚀 **Fast processing** with a single ffmpeg stream-copy pass
     - 📁 **Local files** + **Google Drive integration** with your own credentials
     
     **Supported formats:** MP4, MOV, AVI, MKV
@@ -488,38 +1296,9 @@ setTimeout(updateVideoSeek, 2000);
                 # Single range slider for trim selection
                 gr.Markdown("### ✂️ Trim Range Selector")
                 
-                start_slider = gr.Slider(
-                    minimum=0,
-                    maximum=100,
-                    value=0,
-                    step=0.1,
-                    label="⏯️ Start Time",
-                    info="Drag to set trim start point"
-                )
-                
-                end_slider = gr.Slider(
-                    minimum=0,
-                    maximum=100,
-                    value=100,
-                    step=0.1,
-                    label="⏹️ End Time",
-                    info="Drag to set trim end point"
-                )
-                
-                with gr.Row():
-                    start_time_display = gr.Textbox(
-                        label="⏯️ Start Time",
-                        value="0:00",
-                        interactive=False,
-                        scale=1
-                    )
-                    
-                    end_time_display = gr.Textbox(
-                        label="⏹️ End Time",
-                        value="1:40",
-                        interactive=False,
-                        scale=1
-                    )
+                trim_range = build_trim_range()
+                start_slider, end_slider = trim_range["start_slider"], trim_range["end_slider"]
+                start_time_display, end_time_display = trim_range["start_time_display"], trim_range["end_time_display"]
             
             with gr.Column(scale=1):
                 # Video info and trim controls
@@ -535,6 +1314,12 @@ setTimeout(updateVideoSeek, 2000);
                     seek_start_btn = gr.Button("🎯 Seek to Start", variant="secondary", size="sm")
                     seek_end_btn = gr.Button("🎯 Seek to End", variant="secondary", size="sm")
                 
+                reencode_checkbox = gr.Checkbox(
+                    label="🎯 Re-encode for frame-accurate cuts",
+                    value=False,
+                    info="Slower; by default cuts are stream-copied and snap to the keyframe before the start point"
+                )
+                
                 trim_btn = gr.Button(
                     "✂️ Trim Video",
                     variant="primary",
@@ -600,7 +1385,7 @@ setTimeout(updateVideoSeek, 2000);
     # Google Drive upload functionality
     def upload_to_drive(video_file, audio_file, drive_folder_path):
         """Upload trimmed files to Google Drive"""
-        if not video_file or not audio_file:
+        if not video_file:
             return "❌ No files to upload. Please trim a video first."
         
         if not drive_folder_path:
@@ -615,47 +1400,40 @@ setTimeout(updateVideoSeek, 2000);
             from folder_utils import extract_drive_folder_id
             folder_id = extract_drive_folder_id(drive_folder_path)
             
+            from googleapiclient.discovery import build
             from googleapiclient.http import MediaFileUpload
             
-            uploaded_files = []
+            credentials = service._http.credentials
+            parents = [folder_id] if folder_id else []
             
-            # Upload video file
-            video_name = os.path.basename(video_file)
-            video_metadata = {
-                'name': video_name,
-                'parents': [folder_id] if folder_id else []
-            }
-            video_media = MediaFileUpload(video_file, resumable=True)
-            video_upload = service.files().create(
-                body=video_metadata,
-                media_body=video_media,
-                fields='id,name'
-            ).execute()
-            uploaded_files.append(f"📹 {video_upload['name']}")
+            def upload_file(path):
+                # A service shares one httplib2.Http and is not thread-safe, so each upload builds its own
+                thread_service = build('drive', 'v3', credentials=credentials, cache_discovery=False)
+                ext = os.path.splitext(path)[1].lower()
+                mimetype = UPLOAD_MIME_TYPES.get(ext) or mimetypes.guess_type(path)[0]
+                media = MediaFileUpload(path, mimetype=mimetype, chunksize=DRIVE_UPLOAD_CHUNK_BYTES, resumable=True)
+                return thread_service.files().create(
+                    body={'name': os.path.basename(path), 'parents': parents},
+                    media_body=media,
+                    fields='id,name'
+                ).execute()
             
-            # Upload audio file
-            audio_name = os.path.basename(audio_file)
-            audio_metadata = {
-                'name': audio_name,
-                'parents': [folder_id] if folder_id else []
-            }
-            audio_media = MediaFileUpload(audio_file, resumable=True)
-            audio_upload = service.files().create(
-                body=audio_metadata,
-                media_body=audio_media,
-                fields='id,name'
-            ).execute()
-            uploaded_files.append(f"🎵 {audio_upload['name']}")
+            # Video and audio are independent uploads, so send them concurrently (silent videos have no audio)
+            paths = [video_file, audio_file] if audio_file else [video_file]
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                uploads = list(pool.map(upload_file, paths))
+            
+            uploaded_files = [f"{icon} {upload['name']}" for icon, upload in zip(["📹", "🎵"], uploads)]
             
             return f"✅ Uploaded to Google Drive:\n" + "\n".join(uploaded_files)
             
         except Exception as e:
-            logger.error(f"❌ Error uploading to Drive: {e}")
+            logger.error("❌ Error uploading to Drive: %s", e)
             return f"❌ Upload failed: {str(e)}"
     
     def save_files_locally(video_file, audio_file, local_path):
         """Save trimmed files to local directory"""
-        if not video_file or not audio_file:
+        if not video_file:
             return "❌ No files to save. Please trim a video first."
         
         if not local_path:
@@ -666,20 +1444,18 @@ setTimeout(updateVideoSeek, 2000);
             os.makedirs(local_path, exist_ok=True)
             
             # Copy files to output directory
-            import shutil
-            video_name = os.path.basename(video_file)
-            audio_name = os.path.basename(audio_file)
+            new_video_path = os.path.join(local_path, os.path.basename(video_file))
+            fast_copy(video_file, new_video_path)
+            if not audio_file:  # Silent video, nothing else to save
+                return f"✅ Saved locally:\n📹 {new_video_path}"
             
-            new_video_path = os.path.join(local_path, video_name)
-            new_audio_path = os.path.join(local_path, audio_name)
-            
-            shutil.copy2(video_file, new_video_path)
-            shutil.copy2(audio_file, new_audio_path)
+            new_audio_path = os.path.join(local_path, os.path.basename(audio_file))
+            fast_copy(audio_file, new_audio_path)
             
             return f"✅ Saved locally:\n📹 {new_video_path}\n🎵 {new_audio_path}"
             
         except Exception as e:
-            logger.error(f"❌ Error saving locally: {e}")
+            logger.error("❌ Error saving locally: %s", e)
             return f"❌ Save failed: {str(e)}"
     
     # Save button handlers
@@ -711,7 +1487,7 @@ setTimeout(updateVideoSeek, 2000);
                 choices = [(f"{video['name']} ({video.get('size', 'Unknown')} bytes)", video['id']) for video in videos]
                 return gr.Dropdown(choices=choices, value=None, label="📹 Select Video from Drive")
             except Exception as e:
-                logger.error(f"❌ Error getting Drive files: {e}")
+                logger.error("❌ Error getting Drive files: %s", e)
                 return gr.Dropdown(choices=[], value=None, label="❌ Error loading Drive files")
         
         def load_drive_video(file_id):
@@ -724,18 +1500,14 @@ setTimeout(updateVideoSeek, 2000);
                 if not service:
                     return None, "❌ Google Drive service not available"
                 
-                # Get file info
-                file_info = service.files().get(fileId=file_id).execute()
-                filename = file_info['name']
-                
-                # Download file
-                temp_file = download_from_drive(service, file_id, filename)
+                # Download file (or reuse an unchanged cached copy)
+                temp_file, filename = cache_get_or_download(service, file_id)
                 if temp_file:
                     return temp_file, f"✅ Loaded: {filename}"
                 else:
                     return None, f"❌ Failed to download: {filename}"
             except Exception as e:
-                logger.error(f"❌ Error loading Drive video: {e}")
+                logger.error("❌ Error loading Drive video: %s", e)
                 return None, f"❌ Error: {str(e)}"
         
         with gr.Row():
@@ -790,47 +1562,13 @@ setTimeout(updateVideoSeek, 2000);
             with gr.Column():
                 gr.Markdown("### ✂️ Trim Settings")
                 
-                with gr.Group():
-                    drive_start_slider = gr.Slider(
-                        minimum=0,
-                        maximum=100,
-                        value=0,
-                        step=0.1,
-                        label="⏯️ Start Time"
-                    )
-                    
-                    drive_start_time_display = gr.Textbox(
-                        label="⏯️ Start Time",
-                        value="0:00",
-                        interactive=False
-                    )
-                    
-                    drive_seek_start_btn = gr.Button(
-                        "🎯 Seek to Start",
-                        variant="secondary",
-                        size="sm"
-                    )
+                drive_range = build_trim_range()
+                drive_start_slider, drive_end_slider = drive_range["start_slider"], drive_range["end_slider"]
+                drive_start_time_display, drive_end_time_display = drive_range["start_time_display"], drive_range["end_time_display"]
                 
-                with gr.Group():
-                    drive_end_slider = gr.Slider(
-                        minimum=0,
-                        maximum=100,
-                        value=100,
-                        step=0.1,
-                        label="⏹️ End Time"
-                    )
-                    
-                    drive_end_time_display = gr.Textbox(
-                        label="⏹️ End Time",
-                        value="1:40",
-                        interactive=False
-                    )
-                    
-                    drive_seek_end_btn = gr.Button(
-                        "🎯 Seek to End",
-                        variant="secondary",
-                        size="sm"
-                    )
+                with gr.Row():
+                    drive_seek_start_btn = gr.Button("🎯 Seek to Start", variant="secondary", size="sm")
+                    drive_seek_end_btn = gr.Button("🎯 Seek to End", variant="secondary", size="sm")
                 
                 drive_trim_btn = gr.Button(
                     "✂️ Trim Drive Video",
@@ -868,138 +1606,60 @@ setTimeout(updateVideoSeek, 2000);
         
         # Drive event handlers (legacy tab)
         
-        def load_and_update_drive_video(input_path):
-            if not input_path:
-                return None, "Please enter a file path or Drive link", None, None, None, None, None
-            
-            temp_file, status = load_video_from_path_or_drive(input_path)
-            if temp_file:
-                info, duration, start_val, end_val = get_video_info(temp_file)
-                return (
-                    temp_file,  # drive_video_player
-                    status,     # drive_status
-                    info,       # drive_video_info
-                    gr.Slider(minimum=0, maximum=duration, value=0, step=0.1),  # drive_start_slider
-                    gr.Slider(minimum=0, maximum=duration, value=duration, step=0.1),  # drive_end_slider
-                    "0:00",     # drive_start_time_display
-                    format_time(duration)  # drive_end_time_display
-                )
-            else:
-                return None, status, "Failed to load video", None, None, None, None
-        
         # Set up Drive event handlers
         # browse_drive_btn click handler moved to unified interface
         
         load_drive_btn.click(
-            fn=load_and_update_drive_video,
+            fn=load_remote_video,
             inputs=[drive_file_path],
             outputs=[drive_video_player, drive_status, drive_video_info, drive_start_slider, drive_end_slider, drive_start_time_display, drive_end_time_display]
         )
         
-        # Drive slider event handlers
-        drive_start_slider.change(
-            fn=lambda x: format_time(x),
-            inputs=[drive_start_slider],
-            outputs=[drive_start_time_display]
-        )
-        
-        drive_end_slider.change(
-            fn=lambda x: format_time(x),
-            inputs=[drive_end_slider],
-            outputs=[drive_end_time_display]
-        )
-        
         # Drive seek button handlers
         drive_seek_start_btn.click(
             fn=None,
             inputs=[drive_start_slider],
             outputs=[],
-            js="(start_time) => { const videos = document.querySelectorAll('video'); videos.forEach(v => { if (v.src && v.readyState >= 2) v.currentTime = start_time; }); }"
+            js="(start_time) => { window.seekVideo(start_time); }"
         )
         
         drive_seek_end_btn.click(
             fn=None,
             inputs=[drive_end_slider],
             outputs=[],
-            js="(end_time) => { const videos = document.querySelectorAll('video'); videos.forEach(v => { if (v.src && v.readyState >= 2) v.currentTime = end_time; }); }"
+            js="(end_time) => { window.seekVideo(end_time); }"
         )
         
         # Drive trim button - need to modify to use output path
-        def trim_drive_video(video_file, start_time, end_time, output_path):
+        async def trim_drive_video(video_file, start_time, end_time, output_path, request: gr.Request = None):
             """Trim video with custom output path"""
             if not video_file:
-                return None, None, None, "❌ Please load a video first"
-            
-            # Create output directory
-            os.makedirs(output_path, exist_ok=True)
-            
-            # Call the main trim function but intercept the output
-            result = process_video_trim(video_file, start_time, end_time)
+                yield None, None, None, "❌ Please load a video first"
+                return
             
-            if result[0]:  # If video was successfully trimmed
-                # Move files to custom output path
-                import shutil
-                base_name = Path(video_file).stem
-                new_video = os.path.join(output_path, f"{base_name}_trimmed.mp4")
-                new_audio = os.path.join(output_path, f"{base_name}_trimmed.aac")
-                
-                try:
-                    shutil.move(result[0], new_video)
-                    shutil.move(result[1], new_audio)
-                    return new_video, new_audio, new_audio, f"✅ Trimmed and saved to: {output_path}"
-                except Exception as e:
-                    return result[0], result[1], result[2], f"✅ Trimmed but move failed: {str(e)}"
-            
-            return result
+            # ffmpeg writes straight into the output folder, so there is nothing to move afterwards
+            async for result in process_video_trim(video_file, start_time, end_time, dst_dir=output_path, request=request):
+                if result[0]:
+                    result = (*result[:3], f"{result[3]}\n📁 Saved to: {output_path}")
+                yield result
         
         drive_trim_btn.click(
             fn=trim_drive_video,
             inputs=[drive_video_player, drive_start_slider, drive_end_slider, drive_output_path],
-            outputs=[drive_output_video, drive_output_audio_player, drive_output_audio_download, drive_status_msg]
+            outputs=[drive_output_video, drive_output_audio_player, drive_output_audio_download, drive_status_msg],
+            concurrency_limit=MAX_FFMPEG_JOBS,
+            concurrency_id="trim"
         )
     
     # Event handlers for unified interface
-    def load_local_video(video_file):
+    async def load_local_video(video_file):
         """Load local video file"""
         if not video_file:
-            return None, "Please select a video file", "No video loaded", None, None, None, None
+            yield None, "Please select a video file", "No video loaded", None, None, None, None
+            return
         
-        info, duration, start_val, end_val = get_video_info(video_file)
-        return (
-            video_file,  # main_video_player
-            f"✅ Local file: {os.path.basename(video_file)}",  # load_status
-            info,  # video_info
-            gr.Slider(minimum=0, maximum=duration, value=0, step=0.1),  # start_slider
-            gr.Slider(minimum=0, maximum=duration, value=duration, step=0.1),  # end_slider
-            "0:00",  # start_time_display
-            format_time(duration)  # end_time_display
-        )
-    
-    def load_remote_video(input_path):
-        """Load video from path or Drive link"""
-        if not input_path:
-            return None, "Please enter a file path or Drive link", "No video loaded", None, None, None, None
-        
-        temp_file, status = load_video_from_path_or_drive(input_path)
-        if temp_file:
-            info, duration, start_val, end_val = get_video_info(temp_file)
-            return (
-                temp_file,  # main_video_player
-                status,     # load_status
-                info,       # video_info
-                gr.Slider(minimum=0, maximum=duration, value=0, step=0.1),  # start_slider
-                gr.Slider(minimum=0, maximum=duration, value=duration, step=0.1),  # end_slider
-                "0:00",     # start_time_display
-                format_time(duration)  # end_time_display
-            )
-        else:
-            return None, status, "Failed to load video", None, None, None, None
-    
-    def update_start_display(start_val):
-        return format_time(start_val)
-    
-    def update_end_display(end_val):
-        return format_time(end_val)
+        async for update in load_video_updates(video_file, f"✅ Local file: {os.path.basename(video_file)}"):
+            yield update
     
     def validate_end_time(start_val, end_val):
         """Ensure end time is >= start time"""
@@ -1018,20 +1678,27 @@ setTimeout(updateVideoSeek, 2000);
             if not videos:
                 return "📁 No videos found in your Google Drive"
             
-            result = f"✅ Found {len(videos)} videos in your Drive:\n\n"
-            for i, video in enumerate(videos[:10]):  # Show first 10
-                result += f"{i+1}. {video['name']} (ID: {video['id']})\n"
+            lines = [f"✅ Found {len(videos)} videos in your Drive:", ""]
+            lines += [f"{i+1}. {video['name']} (ID: {video['id']})" for i, video in enumerate(videos[:10])]  # Show first 10
             
             if len(videos) > 10:
-                result += f"\n... and {len(videos) - 10} more videos"
+                lines += ["", f"... and {len(videos) - 10} more videos"]
             
-            result += "\n\n💡 Copy a file ID and paste it in the input above!"
-            return result
+            lines += ["", "💡 Copy a file ID and paste it in the input above!"]
+            return "\n".join(lines)
         except Exception as e:
-            logger.error(f"❌ Error browsing Drive: {e}")
+            logger.error("❌ Error browsing Drive: %s", e)
             return f"❌ Error: {str(e)}"
     
     # Connect event handlers to unified interface
+    # Probe the duration as soon as the upload lands, so the Load click finds it already cached
+    local_video_input.upload(
+        fn=prewarm_video_info,
+        inputs=[local_video_input],
+        outputs=None,
+        show_progress="hidden"
+    )
+    
     local_load_btn.click(
         fn=load_local_video,
         inputs=[local_video_input],
@@ -1047,38 +1714,12 @@ setTimeout(updateVideoSeek, 2000);
     # Removed browse drive functionality as requested
     
     # Slider change handlers with validation
-    start_slider.change(
-        fn=update_start_display,
-        inputs=[start_slider],
-        outputs=[start_time_display]
-    )
-    
-    end_slider.change(
-        fn=update_end_display,
-        inputs=[end_slider],
-        outputs=[end_time_display]
-    )
-    
-    # Validation: end must be >= start
-    start_slider.change(
+    # Validation: end must be >= start. Server-side handlers run on release (mouse-up), not on every step of a drag
+    start_slider.release(
         fn=validate_end_time,
         inputs=[start_slider, end_slider],
-        outputs=[end_slider]
-    )
-    
-    # Slider seeking functionality
-    start_slider.change(
-        fn=None,
-        inputs=[start_slider],
-        outputs=[],
-        js="(start_time) => { const videos = document.querySelectorAll('video'); videos.forEach(v => { if (v.src && v.readyState >= 2) v.currentTime = start_time; }); }"
-    )
-    
-    end_slider.change(
-        fn=None,
-        inputs=[end_slider],
-        outputs=[],
-        js="(end_time) => { const videos = document.querySelectorAll('video'); videos.forEach(v => { if (v.src && v.readyState >= 2) v.currentTime = end_time; }); }"
+        outputs=[end_slider],
+        show_progress="hidden"
     )
     
     # Seek button handlers for trim points  
@@ -1086,22 +1727,30 @@ setTimeout(updateVideoSeek, 2000);
         fn=None,
         inputs=[start_slider],
         outputs=[],
-        js="(start_time) => { const videos = document.querySelectorAll('video'); videos.forEach(v => { if (v.src && v.readyState >= 2) v.currentTime = start_time; }); }"
+        js="(start_time) => { window.seekVideo(start_time); }"
     )
     
     seek_end_btn.click(
         fn=None,
         inputs=[end_slider],
         outputs=[],
-        js="(end_time) => { const videos = document.querySelectorAll('video'); videos.forEach(v => { if (v.src && v.readyState >= 2) v.currentTime = end_time; }); }"
+        js="(end_time) => { window.seekVideo(end_time); }"
     )
     
     # Trim button handler
     trim_btn.click(
         fn=process_video_trim,
-        inputs=[main_video_player, start_slider, end_slider],
-        outputs=[output_video, output_audio_player, output_audio_download, status_msg]
+        inputs=[main_video_player, start_slider, end_slider, reencode_checkbox],
+        outputs=[output_video, output_audio_player, output_audio_download, status_msg],
+        # Both trim buttons share one pool sized to the ffmpeg job limit, so trims don't take
+        # queue slots from cheap events while they wait for ffmpeg
+        concurrency_limit=MAX_FFMPEG_JOBS,
+        concurrency_id="trim"
     )
+    
+    # Fetch the Drive listing while the page renders so the first Drive action doesn't wait on it
+    demo.load(fn=prefetch_drive_list, inputs=None, outputs=None, show_progress="hidden")
+    demo.unload(cleanup_session_dir)
 
 if __name__ == "__main__":
     import sys
@@ -1109,11 +1758,17 @@ if __name__ == "__main__":
     # Enable auto-reload for development
     auto_reload = "--reload" in sys.argv or "--dev" in sys.argv
     
+    warm_ffmpeg()
+    
+    # Let several sessions' handlers run at once; ffmpeg itself is still bounded by MAX_FFMPEG_JOBS
+    demo.queue(default_concurrency_limit=GRADIO_CONCURRENCY, max_size=64)
     demo.launch(
         server_name="0.0.0.0",
         server_port=7890,  # Use specific port to avoid conflicts
         share=False,
         show_error=True,
-        debug=True,
+        debug=auto_reload,  # Blocking debug mode only for --dev/--reload runs
+        # Drive loads are played straight from the download cache, which is outside cwd and the temp dir
+        allowed_paths=[str(DRIVE_CACHE_DIR)],
         # Note: auto-reload not supported in this Gradio version
     )
\ No newline at end of file
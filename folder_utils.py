@@ -3,33 +3,32 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Every Drive folder link form (with or without scheme/host, with or without a leading slash)
+# contains "folders/<id>", so one pattern covers them all
+_FOLDER_LINK_RE = re.compile(r'folders/([a-zA-Z0-9_-]+)')
+# A bare folder ID: at least 25 chars of the Drive ID alphabet
+_FOLDER_ID_RE = re.compile(r'[a-zA-Z0-9_-]{25,}')
+
 def extract_drive_folder_id(input_str):
     """Extract folder ID from Drive folder link or return input if it's already a folder ID"""
     if not input_str:
         return None
     
     input_str = input_str.strip()
-    logger.info(f"🗂️ Extracting folder ID from: {input_str}")
-    
-    # Check if it's a Drive folder link - comprehensive patterns
-    folder_link_patterns = [
-        r'https://drive\.google\.com/drive/folders/([a-zA-Z0-9-_]+)',
-        r'drive\.google\.com/drive/folders/([a-zA-Z0-9-_]+)',  # Without https
-        r'/folders/([a-zA-Z0-9-_]+)',  # Just the /folders/ part
-        r'folders/([a-zA-Z0-9-_]+)'   # Without leading slash
-    ]
+    logger.info("🗂️ Extracting folder ID from: %s", input_str)
     
-    for pattern in folder_link_patterns:
-        match = re.search(pattern, input_str)
-        if match:
-            folder_id = match.group(1)
-            logger.info(f"✅ Extracted folder ID: {folder_id}")
-            return folder_id
-    
-    # Check if it's already a folder ID (alphanumeric string with hyphens/underscores)
-    if re.match(r'^[a-zA-Z0-9-_]{25,}$', input_str):  # At least 25 chars for Drive folder IDs
-        logger.info(f"✅ Using direct folder ID: {input_str}")
+    # Check if it's already a folder ID (alphanumeric string with hyphens/underscores); the common
+    # case, and a link can never match it since links contain '/'
+    if _FOLDER_ID_RE.fullmatch(input_str):
+        logger.info("✅ Using direct folder ID: %s", input_str)
         return input_str
     
-    logger.warning(f"❌ Could not extract folder ID from: {input_str}")
+    # Check if it's a Drive folder link
+    match = _FOLDER_LINK_RE.search(input_str)
+    if match:
+        folder_id = match.group(1)
+        logger.info("✅ Extracted folder ID: %s", folder_id)
+        return folder_id
+    
+    logger.warning("❌ Could not extract folder ID from: %s", input_str)
     return None
\ No newline at end of file
@@ -0,0 +1,249 @@
+import os
+import struct
+import contextlib
+import logging
+
+try:
+    import av
+except ImportError:  # PyAV is optional; callers fall back to the ffmpeg CLI
+    av = None
+
+logger = logging.getLogger(__name__)
+
+# Container header parsers used to read a video's duration without spawning ffprobe.
+# Each parser returns the duration in seconds, or None if the header could not be parsed.
+
+def _mp4_duration(path):
+    """Read duration from the moov/mvhd atom of an MP4/MOV file"""
+    with open(path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        offset = 0
+        moov_end = None
+        while offset + 8 <= file_size:
+            f.seek(offset)
+            size, atom_type = struct.unpack('>I4s', f.read(8))
+            header_size = 8
+            if size == 1:  # 64-bit extended size
+                size = struct.unpack('>Q', f.read(8))[0]
+                header_size = 16
+            elif size == 0:  # Atom extends to end of file
+                size = (moov_end or file_size) - offset
+            if size < header_size:
+                return None
+
+            if atom_type == b'moov':
+                # Descend into moov and keep scanning its children
+                moov_end = offset + size
+                offset += header_size
+                continue
+            if atom_type == b'mvhd' and moov_end is not None:
+                version = f.read(1)[0]
+                f.read(3)  # flags
+                if version == 1:
+                    timescale, duration = struct.unpack('>16xIQ', f.read(28))
+                else:
+                    timescale, duration = struct.unpack('>8xII', f.read(16))
+                return duration / timescale if timescale else None
+
+            offset += size
+            if moov_end is not None and offset >= moov_end:
+                return None
+    return None
+
+def _read_ebml_vint(f, keep_marker):
+    """Read an EBML variable-length integer, returning (value, length)"""
+    first = f.read(1)
+    if not first:
+        return None, 0
+    first = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        return None, 0
+    value = first if keep_marker else first & (mask - 1)
+    for byte in f.read(length - 1):
+        value = (value << 8) | byte
+    return value, length
+
+def _mkv_duration(path):
+    """Read duration from the Segment/Info element of a Matroska/WebM file"""
+    EBML_HEADER, SEGMENT, INFO = 0x1A45DFA3, 0x18538067, 0x1549A966
+    TIMECODE_SCALE, DURATION, CLUSTER = 0x2AD7B1, 0x4489, 0x1F43B675
+
+    with open(path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        element_id, _ = _read_ebml_vint(f, keep_marker=True)
+        if element_id != EBML_HEADER:
+            return None
+        size, _ = _read_ebml_vint(f, keep_marker=False)
+        if size is None:
+            return None
+        f.seek(size, os.SEEK_CUR)
+
+        element_id, _ = _read_ebml_vint(f, keep_marker=True)
+        if element_id != SEGMENT:
+            return None
+        _read_ebml_vint(f, keep_marker=False)  # Segment size (may be "unknown" for live files)
+
+        # Walk the Segment's children until we find Info
+        while f.tell() < file_size:
+            element_id, _ = _read_ebml_vint(f, keep_marker=True)
+            size, size_len = _read_ebml_vint(f, keep_marker=False)
+            if element_id is None or size is None or element_id == CLUSTER:
+                return None
+            if element_id != INFO:
+                if size == (1 << (7 * size_len)) - 1:  # Unknown-size element, cannot skip
+                    return None
+                f.seek(size, os.SEEK_CUR)
+                continue
+
+            info_end = f.tell() + size
+            if info_end > file_size:
+                return None
+            timecode_scale = 1_000_000  # Matroska default: milliseconds
+            duration = None
+            while f.tell() < info_end:
+                child_id, _ = _read_ebml_vint(f, keep_marker=True)
+                child_size, _ = _read_ebml_vint(f, keep_marker=False)
+                if child_id is None or child_size is None or f.tell() + child_size > info_end:
+                    return None
+                if child_id == TIMECODE_SCALE and child_size <= 8:
+                    timecode_scale = int.from_bytes(f.read(child_size), 'big')
+                elif child_id == DURATION and child_size in (4, 8):
+                    duration = struct.unpack('>f' if child_size == 4 else '>d', f.read(child_size))[0]
+                else:
+                    # Title, muxing app, etc.: skip without reading them into memory
+                    f.seek(child_size, os.SEEK_CUR)
+            if duration is None:
+                return None
+            return duration * timecode_scale / 1e9
+    return None
+
+def _avi_duration(path):
+    """Read duration from the avih main header (or the OpenDML dmlh header) of an AVI file"""
+    with open(path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        # hdrl, including any OpenDML super-index, sits at the start of the file
+        header = f.read(64 * 1024)
+    if header[:4] != b'RIFF' or header[8:12] != b'AVI ':
+        return None
+    index = header.find(b'avih')
+    if index < 0 or len(header) < index + 28:
+        return None
+    usec_per_frame, _, _, _, total_frames = struct.unpack('<5I', header[index + 8:index + 28])
+
+    # In OpenDML files (> 1 GB) avih only counts the frames of the first RIFF chunk; the real
+    # total is in odml/dmlh. If more RIFF chunks follow (AVIX) and there is no dmlh, give up.
+    dmlh = header.find(b'dmlh')
+    if dmlh >= 0 and len(header) >= dmlh + 12:
+        total_frames = struct.unpack('<I', header[dmlh + 8:dmlh + 12])[0]
+    elif struct.unpack('<I', header[4:8])[0] + 8 < file_size:
+        return None
+    return total_frames * usec_per_frame / 1e6
+
+_DURATION_PARSERS = {
+    '.mp4': _mp4_duration,
+    '.m4v': _mp4_duration,
+    '.mov': _mp4_duration,
+    '.mkv': _mkv_duration,
+    '.webm': _mkv_duration,
+    '.avi': _avi_duration,
+}
+
+def read_container_duration(path):
+    """Read video duration in seconds from the container header, or None if unsupported"""
+    parser = _DURATION_PARSERS.get(os.path.splitext(path)[1].lower())
+    if parser is None:
+        return None
+
+    try:
+        duration = parser(path)
+    except (OSError, struct.error, IndexError, ValueError, TypeError, MemoryError) as e:
+        logger.debug("Header parse failed for %s: %s", path, e)
+        return None
+
+    if duration is None or duration <= 0:
+        return None
+    return duration
+
+def _add_stream_like(container, stream):
+    """Add an output stream copying stream's codec parameters (PyAV 14 renamed add_stream(template=...))"""
+    if hasattr(container, 'add_stream_from_template'):
+        return container.add_stream_from_template(stream)
+    return container.add_stream(template=stream)
+
+def trim_with_pyav(video_file, start_seconds, end_seconds, output_video, output_audio):
+    """Stream-copy [start, end] into output_video and its audio track into output_audio, in-process
+
+    Returns True if an audio track was written; inputs without audio (or output_audio=None) only
+    produce output_video.
+    """
+    if av is None:
+        raise RuntimeError("PyAV is not installed")
+
+    with av.open(video_file) as source, contextlib.ExitStack() as outputs:
+        in_video = source.streams.video[0]
+        # Silent inputs (screen recordings, GIF conversions) have no audio stream at all
+        in_audio = source.streams.audio[0] if source.streams.audio and output_audio else None
+        video_out = outputs.enter_context(av.open(output_video, 'w', options={'movflags': '+faststart'}))
+        out_video = _add_stream_like(video_out, in_video)
+        if in_audio is not None:
+            audio_out = outputs.enter_context(av.open(output_audio, 'w', format='adts'))
+            out_audio = _add_stream_like(video_out, in_audio)
+            out_audio_only = _add_stream_like(audio_out, in_audio)
+        in_streams = [in_video] if in_audio is None else [in_video, in_audio]
+
+        # Like ffmpeg's input-side -ss with stream copy: start at the keyframe at or before start
+        source.seek(int(start_seconds * av.time_base), backward=True)
+        origin = None
+        skipped_video = False
+        finished = set()
+        for packet in source.demux(*in_streams):
+            if packet.pts is None:
+                continue
+            if packet.dts is None:
+                # Matroska leaves dts unset on the first packet after a seek (the keyframe we want)
+                packet.dts = packet.pts
+            packet_time = float(packet.pts * packet.time_base)
+            if packet_time > end_seconds:
+                finished.add(packet.stream.index)
+                if len(finished) == len(in_streams):
+                    break
+                continue
+
+            if origin is None:
+                # Output timestamps start at the first video keyframe (-avoid_negative_ts make_zero)
+                if packet.stream.index != in_video.index or not packet.is_keyframe:
+                    skipped_video = skipped_video or packet.stream.index == in_video.index
+                    continue
+                if skipped_video and packet_time > start_seconds:
+                    # The seek landed on video we couldn't start from, so the clip would silently begin
+                    # late; fail instead so the caller falls back to the ffmpeg CLI
+                    raise RuntimeError(f"PyAV trim would start at {packet_time:.3f}s instead of {start_seconds:.3f}s")
+                origin = packet_time
+            elif packet_time < origin:
+                continue
+
+            shift = round(origin / packet.time_base)
+            packet.pts -= shift
+            packet.dts -= shift
+
+            if packet.stream.index == in_video.index:
+                packet.stream = out_video
+                video_out.mux(packet)
+            else:
+                # Muxing hands the packet to libavformat, so the ADTS output gets its own copy
+                audio_copy = av.Packet(bytes(packet))
+                audio_copy.pts, audio_copy.dts = packet.pts, packet.dts
+                audio_copy.time_base = packet.time_base
+                audio_copy.stream = out_audio_only
+                packet.stream = out_audio
+                video_out.mux(packet)
+                audio_out.mux(audio_copy)
+
+    if origin is None:
+        raise RuntimeError("No video keyframe found in the requested range")
+    return in_audio is not None
@@ -66,12 +66,15 @@ echo "Processing video: $INPUT_FILE"
 # Get video duration
 duration=$(ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "$INPUT_FILE")
 
-# Build ffmpeg command based on parameters
-FF_CMD="ffmpeg -v warning -stats -i \"$INPUT_FILE\""
+# Silent videos have no audio stream; they only get the trimmed video, no AAC file
+has_audio=$(ffprobe -v error -select_streams a:0 -show_entries stream=index -of csv=p=0 "$INPUT_FILE")
+
+# Build the time range options (output options, so they are repeated for each output)
+TIME_OPTS=""
 
 # Add start time if specified
 if [ ! -z "$START_TIME" ]; then
-    FF_CMD="$FF_CMD -ss $START_TIME"
+    TIME_OPTS="$TIME_OPTS -ss $START_TIME"
     echo "Start time: $START_TIME"
 else
     echo "Start time: Beginning of file"
@@ -79,48 +82,51 @@ fi
 
 # Add end time if specified
 if [ ! -z "$END_TIME" ]; then
-    FF_CMD="$FF_CMD -to $END_TIME"
+    TIME_OPTS="$TIME_OPTS -to $END_TIME"
     echo "End time: $END_TIME"
 else
     echo "End time: End of file"
 fi
 
-# Try to use stream copy for speed
-echo "Processing video - using fast copy method..."
-FF_CMD="$FF_CMD -c:v copy -c:a copy -avoid_negative_ts 1 \"$VIDEO_OUTPUT\""
+# One ffmpeg run writes both the trimmed video and the AAC track, so the input is read once
+echo "Processing video and extracting audio (AAC) - using fast copy method..."
+FF_CMD="ffmpeg -v warning -stats -i \"$INPUT_FILE\""
+FF_CMD="$FF_CMD$TIME_OPTS -map 0:v:0 -map '0:a:0?' -c:v copy -c:a copy -avoid_negative_ts 1 \"$VIDEO_OUTPUT\""
+if [ -n "$has_audio" ]; then
+    FF_CMD="$FF_CMD$TIME_OPTS -map 0:a:0 -vn -acodec copy \"$AUDIO_OUTPUT\""
+fi
 
 # Execute the command
 eval $FF_CMD
 
 # Check if the command succeeded
-if [ $? -ne 0 ]; then
+status=$?
+if [ $status -ne 0 ]; then
     echo "Fast method failed, trying with re-encoding..."
-    # If stream copy failed, fall back to re-encoding
-    FF_CMD="ffmpeg -v warning -stats -i \"$INPUT_FILE\""
-    
-    # Add time parameters again
-    if [ ! -z "$START_TIME" ]; then
-        FF_CMD="$FF_CMD -ss $START_TIME"
+    # If stream copy failed, fall back to re-encoding (overwriting any partial outputs)
+    FF_CMD="ffmpeg -y -v warning -stats -i \"$INPUT_FILE\""
+    FF_CMD="$FF_CMD$TIME_OPTS -map 0:v:0 -map '0:a:0?' -c:v libx264 -preset ultrafast -crf 17 -c:a aac -b:a 128k \"$VIDEO_OUTPUT\""
+    if [ -n "$has_audio" ]; then
+        FF_CMD="$FF_CMD$TIME_OPTS -map 0:a:0 -vn -c:a aac -b:a 128k \"$AUDIO_OUTPUT\""
     fi
     
-    if [ ! -z "$END_TIME" ]; then
-        FF_CMD="$FF_CMD -to $END_TIME"
-    fi
-    
-    # Use encoding parameters
-    FF_CMD="$FF_CMD -c:v libx264 -preset ultrafast -crf 17 -c:a aac -b:a 128k \"$VIDEO_OUTPUT\""
-    
     # Execute the fallback command
     eval $FF_CMD
+    status=$?
+    if [ $status -ne 0 ]; then
+        echo "Error: ffmpeg failed (exit code $status)."
+        exit $status
+    fi
 fi
 
-echo "Extracting audio (AAC)..."
-ffmpeg -v warning -stats -i "$VIDEO_OUTPUT" -vn -acodec copy "$AUDIO_OUTPUT"
-
 # Get file sizes
 video_size=$(du -h "$VIDEO_OUTPUT" | cut -f1)
-audio_size=$(du -h "$AUDIO_OUTPUT" | cut -f1)
 
 echo "Done!"
 echo "Trimmed video: $VIDEO_OUTPUT ($video_size)"
-echo "Audio file: $AUDIO_OUTPUT ($audio_size)"
\ No newline at end of file
+if [ -n "$has_audio" ]; then
+    audio_size=$(du -h "$AUDIO_OUTPUT" | cut -f1)
+    echo "Audio file: $AUDIO_OUTPUT ($audio_size)"
+else
+    echo "Audio file: none (input has no audio track)"
+fi
\ No newline at end of file